@@ -81,6 +81,8 @@ GRAPHQL_JWT = {
 
 SORTINGHAT_API_PAGE_SIZE = 10
 
+SORTINGHAT_UUID_HASH = 'sha1'
+
 MULTI_TENANT = False
 
 
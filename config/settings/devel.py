@@ -153,6 +153,8 @@ LOGGING = {
 
 SORTINGHAT_API_PAGE_SIZE = 2
 
+SORTINGHAT_UUID_HASH = 'sha1'
+
 AUTHENTICATION_BACKENDS = [
     'graphql_jwt.backends.JSONWebTokenBackend',
     'django.contrib.auth.backends.ModelBackend',
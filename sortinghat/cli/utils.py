@@ -32,6 +32,10 @@ from .client import (SortingHatClient,
                      SortingHatClientError)
 
 
+TEMPLATES_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)),
+                             "templates")
+
+
 def _set_ssl_cb(ctx, param, value):
     ctx.params['ssl'] = None
     if value is not None:
@@ -62,6 +66,42 @@ _conn_options = [
 ]
 
 
+def _param_resolver(name):
+    """Generate a function to choose between param or configuration value."""
+
+    def _choose_param(cfg, param):
+        if param is not None:
+            return param
+        elif not cfg:
+            return None
+        else:
+            return cfg.get(name, None)
+
+    return _choose_param
+
+
+def _choose_ssl_param(cfg, param):
+    """Choose between SSL param or configuration value."""
+
+    if param is not None:
+        return param
+    elif not cfg:
+        return None
+    else:
+        value = cfg.get('ssl', 'true')
+        return value.lower() in ['true', '1']
+
+
+_client_params_resolvers = {
+    'host': _param_resolver('host'),
+    'port': _param_resolver('port'),
+    'path': _param_resolver('path'),
+    'user': _param_resolver('user'),
+    'password': _param_resolver('password'),
+    'ssl': _choose_ssl_param
+}
+
+
 def sh_client_cmd_options(func):
     """Decorator to add options to a command to initialize a client."""
 
@@ -76,35 +116,17 @@ def sh_client(func):
     This decorator initializes a client that will be
     available in the context object.
     """
-    def _choose_param(name, cfg, param):
-        """Choose between param or configuration value."""
-
-        if param is not None:
-            return param
-        elif not cfg:
-            return None
-        else:
-            if name == 'ssl':
-                value = cfg.get(name, 'true')
-                return value.lower() in ['true', '1']
-            else:
-                return cfg.get(name, None)
-
     @click.pass_context
     def initialize_client(ctx, *args, **kwargs):
-        client_params = [
-            'host', 'port', 'path', 'user', 'password', 'ssl'
-        ]
-
         params = {
-            name: _choose_param(name, ctx.obj, kwargs.pop(name))
-            for name in client_params
+            name: resolver(ctx.obj, kwargs.pop(name))
+            for name, resolver in _client_params_resolvers.items()
         }
 
         # Create a client object and remember it as as the context object.
         client = SortingHatClient(**params)
         ctx.obj = client
-        return ctx.invoke(func, ctx, *args, **kwargs)
+        return func(ctx, *args, **kwargs)
 
     return functools.update_wrapper(initialize_client, func)
 
@@ -145,12 +167,20 @@ def display(template, nl=True, **kwargs):
     :param nl: if set to `True`, it renders a newline afterwards
     :param kwargs: list of attributes required to render the template
     """
-    templates_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)),
-                                 "templates")
-    loader = jinja2.FileSystemLoader(templates_dir)
-    env = jinja2.Environment(loader=loader,
-                             lstrip_blocks=True, trim_blocks=True)
-
-    t = env.get_template(template)
+    t = _jinja_env().get_template(template)
     s = t.render(**kwargs)
     click.echo(s, nl=nl)
+
+
+@functools.lru_cache(maxsize=None)
+def _jinja_env():
+    """Jinja environment used to render the templates.
+
+    The environment is created only once, so templates
+    compiled by Jinja are cached between calls.
+    """
+    loader = jinja2.FileSystemLoader(TEMPLATES_DIR)
+    env = jinja2.Environment(loader=loader,
+                             lstrip_blocks=True, trim_blocks=True,
+                             auto_reload=False)
+    return env
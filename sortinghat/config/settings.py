@@ -359,6 +359,22 @@ SORTINGHAT_AUTHENTICATION_REQUIRED = True
 
 SORTINGHAT_API_PAGE_SIZE = 10
 
+#
+# Hash algorithm used to generate the UUIDs of the identities.
+# Valid values are 'sha1' (default) and 'blake3'. BLAKE3 is faster
+# but it requires to install 'blake3' package (`sortinghat[blake3]`).
+# Don't change this value once the registry has identities; they
+# will have UUIDs generated with the previous algorithm and new ones
+# won't match.
+#
+# This setting is only used by SortingHat. Other tools calling
+# `sortinghat.utils.generate_uuid` use SHA1 by default, so the
+# UUIDs they compute won't match the ones of a registry using
+# BLAKE3 unless they set the same algorithm.
+#
+
+SORTINGHAT_UUID_HASH = os.environ.get('SORTINGHAT_UUID_HASH', 'sha1')
+
 #
 # genderize.io token, used only for gender recommendations
 #
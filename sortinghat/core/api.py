@@ -22,6 +22,8 @@
 
 import logging
 
+from django.conf import settings
+
 from grimoirelab_toolkit.datetime import datetime_to_utc
 
 from .db import (find_individual_by_uuid,
@@ -66,7 +68,7 @@ from .log import TransactionsLog
 from .models import Identity, MIN_PERIOD_DATE, MAX_PERIOD_DATE
 from .aux import merge_datetime_ranges
 from .decorators import atomic_using_tenant
-from ..utils import generate_uuid
+from ..utils import SHA1, generate_uuid
 
 
 logger = logging.getLogger(__name__)
@@ -123,9 +125,12 @@ def add_identity(ctx, source, name=None, email=None, username=None, uuid=None):
     """
     trxl = TransactionsLog.open('add_identity', ctx)
 
+    algorithm = getattr(settings, 'SORTINGHAT_UUID_HASH', SHA1)
+
     try:
         id_ = generate_uuid(source, email=email,
-                            name=name, username=username)
+                            name=name, username=username,
+                            algorithm=algorithm)
     except ValueError as e:
         raise InvalidValueError(msg=str(e))
 
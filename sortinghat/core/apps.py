@@ -22,8 +22,21 @@
 import os
 
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from ..utils import SHA1, validate_hash_algorithm
 
 
 class SortingHatCoreConfig(AppConfig):
     name = 'sortinghat.core'
     path = os.path.dirname(os.path.abspath(__file__))
+
+    def ready(self):
+        """Check the configuration of the app on startup."""
+
+        try:
+            validate_hash_algorithm(getattr(settings, 'SORTINGHAT_UUID_HASH', SHA1))
+        except ValueError as e:
+            msg = "invalid 'SORTINGHAT_UUID_HASH' setting; {}".format(e)
+            raise ImproperlyConfigured(msg)
@@ -147,6 +147,24 @@ def find_identity(uuid):
         return identity
 
 
+def search_identities(uuids):
+    """Look for a set of identities.
+
+    Find in the database the identities whose UUIDs are
+    in `uuids`. Those UUIDs that are not found will be
+    ignored. The individual of each identity will be also
+    retrieved on the same query.
+
+    :param uuids: list of identity UUIDs
+
+    :returns: a list of identity objects
+    """
+    logger.debug(f"Run identities search; number of uuids={len(uuids)}")
+    identities = Identity.objects.filter(uuid__in=uuids).select_related('individual')
+
+    return list(identities)
+
+
 def find_organization(name):
     """Find an organization.
 
@@ -175,6 +193,26 @@ def find_organization(name):
         return organization
 
 
+def search_organizations(names):
+    """Look for a set of organizations.
+
+    Find in the database the organizations whose name or
+    any of their aliases is in `names`. Those names that
+    are not found will be ignored.
+
+    :param names: list of organization names or aliases
+
+    :returns: a list of organization objects
+    """
+    logger.debug(f"Run organizations search; number of names={len(names)}")
+    organizations = Organization.objects.all_organizations()
+    organizations = organizations.filter(Q(name__in=names) | Q(aliases__alias__in=names))
+
+    organizations = organizations.distinct().prefetch_related('aliases')
+
+    return list(organizations)
+
+
 def find_team(team_name, organization=None):
     """Find a team.
 
@@ -19,8 +19,11 @@
 #     Jose Javier Merchante <jjmerchante@bitergia.com>
 #
 
+import itertools
 import logging
 
+from django.conf import settings
+
 import sortinghat.core.importer.backends
 from grimoirelab_toolkit.introspect import inspect_signature_parameters
 from .. import api, db
@@ -31,6 +34,7 @@ from ..errors import (LoadError,
                       DuplicateRangeError)
 from ..importer.utils import find_backends
 from ..models import MIN_PERIOD_DATE, MAX_PERIOD_DATE
+from ...utils import SHA1, clear_uuids_cache, generate_uuids_batch
 
 logger = logging.getLogger(__name__)
 
@@ -42,13 +46,14 @@ class IdentitiesImporter:
 
     To avoid a :class:`NotImplementedError`, derived classes have to implement
     or define:
-     - :func:`get_individuals`, that returns a list of individuals with
-        their identities.
+     - :func:`get_individuals`, that returns an iterable of individuals
+        with their identities.
      - :func:`__init__` (optional), with the required arguments that will
         be asked for the user in the UI.
      - :data:`NAME`, to define the name of the backend used for the UI.
     """
     NAME = None
+    BATCH_SIZE = 1000
 
     def __init__(self, ctx, url):
         self.ctx = ctx
@@ -58,7 +63,8 @@ class IdentitiesImporter:
         """Fetch individuals.
 
         The method retrieves individuals from a specific source. It should
-        return a list of individuals with their related identities.
+        return an iterable, like a list or a generator, of individuals with
+        their related identities.
 
         Each backend implements this method.
         """
@@ -76,87 +82,218 @@ class IdentitiesImporter:
         """
         logger.info("Importing individuals")
 
-        individuals = self.get_individuals()
+        individuals = iter(self.get_individuals())
 
+        # Individuals are loaded in batches, so the whole
+        # list of individuals is not needed in memory
         total = 0
+        try:
+            batch = list(itertools.islice(individuals, self.BATCH_SIZE))
+            while batch:
+                total += self.__load_individuals(batch)
+                batch = list(itertools.islice(individuals, self.BATCH_SIZE))
+        finally:
+            # UUIDs are not needed anymore
+            clear_uuids_cache()
+
+        logger.info("Individuals loaded")
+        return total
+
+    def __load_individuals(self, individuals):
+        """Load a batch of individuals.
+
+        :return number of identities imported
+        """
+        # Generate the UUIDs of all the identities at once and
+        # find which ones are already stored in the registry
+        # together with their individuals
+        identities = [identity
+                      for individual in individuals
+                      for identity in individual.identities]
+        algorithm = getattr(settings, 'SORTINGHAT_UUID_HASH', SHA1)
+        uuids = generate_uuids_batch([(identity.source, identity.email,
+                                       identity.name, identity.username)
+                                      for identity in identities],
+                                     algorithm=algorithm)
+        stored_identities = self.__find_stored_identities(uuids)
+        uuids = iter(uuids)
+
+        # Individuals to merge are grouped in sets and merged
+        # once all the identities have been loaded
+        merges = []
+        merge_sets = {}
+
+        total = 0
+        loaded = []
         for individual in individuals:
-            uuid, nidentities = self.__load_identities(individual.identities)
+            identities_uuids = [next(uuids) for _ in individual.identities]
+            uuid, nidentities = self.__load_identities(individual.identities,
+                                                       identities_uuids,
+                                                       stored_identities,
+                                                       merges)
             if uuid:
-                self.__load_enrollments(individual.enrollments, uuid)
-            if uuid and individual.profile:
+                loaded.append((individual, uuid))
+            total += nidentities
+
+        for from_uuid, to_uuid in merges:
+            _join_merge_sets(merge_sets, from_uuid, to_uuid)
+
+        # Enrollments and profiles are loaded before merging the
+        # individuals, so the merge combines them with the ones of
+        # the individuals already stored in the registry
+        enrollments = []
+        for individual, uuid in loaded:
+            self.__load_enrollments(individual.enrollments, uuid, enrollments)
+            if individual.profile:
                 # Use the profile defined in the individual
                 self.__load_profile(individual.profile, uuid)
-            total += nidentities
 
-        logger.info("Individuals loaded")
+        self.__add_enrollments(enrollments)
+
+        self.__merge_individuals(merge_sets)
+
         return total
 
-    def __load_identities(self, identities):
+    def __find_stored_identities(self, uuids):
+        """Find which identities of the list are stored in the registry.
+
+        :return dict with the UUIDs of the identities already stored
+            and the individuals they belong to
+        """
+        uuids = [uuid for uuid in uuids if uuid]
+        identities = db.search_identities(uuids)
+
+        return {identity.uuid: identity.individual for identity in identities}
+
+    def __load_identities(self, identities, identities_uuids,
+                          stored_identities, merges):
         """Load identities related with a specific individual.
 
         This method imports a list of identities that belongs to the
-        same individual.
+        same individual. `identities_uuids` is the list of UUIDs of
+        those identities and `stored_identities` maps the identities
+        already stored in the registry to their individuals; it will
+        be updated with the new identities.
 
         Those identities that belongs to different individuals will be
-        merged. If not exists any of the identities, a new individual and
+        added to `merges` as `(from_uuid, to_uuid)` pairs to merge them
+        later. The remaining identities are added to the individual of
+        the last stored identity found, which is also the individual
+        returned.
+        If not exists any of the identities, a new individual and
         profile will be created for all of them.
 
         :return 'uuid' of the individual and number of identities imported
         """
         uuid = None
+        locked = False
         nidentities = 0
 
-        for identity in identities:
-            try:
-                new_identity = api.add_identity(ctx=self.ctx,
-                                                source=identity.source,
-                                                email=identity.email,
-                                                name=identity.name,
-                                                username=identity.username,
-                                                uuid=uuid)
-                if not uuid:
-                    uuid = new_identity.individual.mk
-                nidentities += 1
-            except InvalidValueError as e:
-                logger.warning(str(e))
-            except AlreadyExistsError as e:
-                stored_identity = db.find_identity(e.eid)
-                stored_uuid = stored_identity.individual.mk
-
-                if not uuid:
-                    uuid = stored_uuid
-
-                if uuid != stored_uuid:
-                    if stored_identity.individual.is_locked:
-                        logger.warning(f"Individual {stored_uuid} is locked. Not merging.")
-                        continue
-                    logger.info(f"Merging {uuid} and {stored_uuid}")
-                    api.merge(self.ctx, [uuid], stored_uuid)
-                    uuid = stored_uuid
+        for identity, identity_uuid in zip(identities, identities_uuids):
+            if identity_uuid not in stored_identities:
+                try:
+                    new_identity = api.add_identity(ctx=self.ctx,
+                                                    source=identity.source,
+                                                    email=identity.email,
+                                                    name=identity.name,
+                                                    username=identity.username,
+                                                    uuid=uuid)
+                except InvalidValueError as e:
+                    logger.warning(str(e))
+                    continue
+                except AlreadyExistsError:
+                    # Identity added after the registry was checked
+                    stored_identity = db.find_identity(identity_uuid)
+                    stored_identities[identity_uuid] = stored_identity.individual
+                else:
+                    stored_identities[new_identity.uuid] = new_identity.individual
+                    if not uuid:
+                        uuid = new_identity.individual.mk
+                    nidentities += 1
+                    continue
+
+            stored_individual = stored_identities[identity_uuid]
+            stored_uuid = stored_individual.mk
+
+            if not uuid:
+                uuid = stored_uuid
+                locked = stored_individual.is_locked
+
+            if uuid != stored_uuid:
+                if stored_individual.is_locked:
+                    logger.warning(f"Individual {stored_uuid} is locked. Not merging.")
+                    continue
+                if locked:
+                    logger.warning(f"Individual {uuid} is locked. Not merging.")
+                    continue
+                merges.append((uuid, stored_uuid))
+                uuid = stored_uuid
 
         return uuid, nidentities
 
-    def __load_enrollments(self, enrollments, uuid):
-        """Load enrollments for an individual"""
+    def __merge_individuals(self, merge_sets):
+        """Merge the individuals of each set.
 
+        The individuals of the same set are merged into the
+        representative individual of that set.
+        """
+        to_merge = {}
+        for mk in merge_sets:
+            to_uuid = _find_merge_set(merge_sets, mk)
+            if mk != to_uuid:
+                to_merge.setdefault(to_uuid, []).append(mk)
+
+        for to_uuid, from_uuids in to_merge.items():
+            logger.info(f"Merging {from_uuids} and {to_uuid}")
+            api.merge(self.ctx, from_uuids, to_uuid)
+
+    def __load_enrollments(self, enrollments, uuid, pending):
+        """Load enrollments for an individual.
+
+        Enrollments are not added to the registry. Instead, they are
+        appended to `pending` as `(organization, uuid, from_date, to_date)`
+        tuples, to add all of them at once.
+        """
         for enrollment in enrollments:
             organization_name = enrollment.organization.name
             if not organization_name:
                 continue
 
+            if not enrollment.start:
+                enrollment.start = MIN_PERIOD_DATE
+            if not enrollment.end:
+                enrollment.end = MAX_PERIOD_DATE
+            from_date = max(MIN_PERIOD_DATE, enrollment.start)
+            to_date = min(MAX_PERIOD_DATE, enrollment.end)
+
+            pending.append((organization_name, uuid, from_date, to_date))
+
+    def __add_enrollments(self, enrollments):
+        """Add a list of enrollments to the registry.
+
+        Organizations are added before enrolling individuals.
+        Each organization is added only once even when it is
+        used by several enrollments, and only when it is not
+        stored in the registry.
+        """
+        organizations = dict.fromkeys(name for name, _, _, _ in enrollments)
+        stored_organizations = self.__find_stored_organizations(list(organizations))
+        failed = set()
+
+        for organization_name in organizations:
+            if organization_name in stored_organizations:
+                continue
             try:
                 api.add_organization(self.ctx, name=organization_name)
             except AlreadyExistsError:
                 pass
             except Exception as e:
                 logger.error(f"Error adding organization {organization_name}: {e}")
+                failed.add(organization_name)
+
+        for organization_name, uuid, from_date, to_date in enrollments:
+            if organization_name in failed:
                 continue
-            if not enrollment.start:
-                enrollment.start = MIN_PERIOD_DATE
-            if not enrollment.end:
-                enrollment.end = MAX_PERIOD_DATE
-            from_date = max(MIN_PERIOD_DATE, enrollment.start)
-            to_date = min(MAX_PERIOD_DATE, enrollment.end)
 
             try:
                 api.enroll(self.ctx, uuid=uuid, group=organization_name,
@@ -168,6 +305,22 @@ class IdentitiesImporter:
             except (ValueError, NotFoundError) as e:
                 raise LoadError(cause=str(e))
 
+    def __find_stored_organizations(self, names):
+        """Find which organizations of the list are stored in the registry.
+
+        :return set with the names and aliases of the organizations
+            already stored
+        """
+        if not names:
+            return set()
+
+        stored = set()
+        for organization in db.search_organizations(names):
+            stored.add(organization.name)
+            stored.update(alias.alias for alias in organization.aliases.all())
+
+        return stored
+
     def __load_profile(self, profile, uuid):
         """Update the profile of the given individual.
 
@@ -193,6 +346,39 @@ class IdentitiesImporter:
         api.update_profile(self.ctx, uuid, **params)
 
 
+def _find_merge_set(merge_sets, mk):
+    """Find the representative individual of the set where `mk` is.
+
+    Sets are stored as a disjoint-set forest where each individual
+    points to its parent; roots point to themselves.
+    """
+    root = merge_sets.get(mk, mk)
+    while merge_sets.get(root, root) != root:
+        root = merge_sets[root]
+
+    # Compress the path to speed up the next searches
+    while mk != root:
+        parent = merge_sets[mk]
+        merge_sets[mk] = root
+        mk = parent
+
+    return root
+
+
+def _join_merge_sets(merge_sets, from_mk, to_mk):
+    """Join the sets of `from_mk` and `to_mk`.
+
+    The representative individual of `to_mk` will be the
+    representative of the new set.
+    """
+    from_root = _find_merge_set(merge_sets, from_mk)
+    to_root = _find_merge_set(merge_sets, to_mk)
+
+    merge_sets[to_root] = to_root
+    if from_root != to_root:
+        merge_sets[from_root] = to_root
+
+
 def find_import_identities_backends():
     """Find backends that implements IdentitiesImporter.
 
@@ -16,9 +16,31 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import functools
 import hashlib
+import sys
 import unicodedata
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+
+# Maximum number of UUIDs stored in the cache of `generate_uuid`
+UUIDS_CACHE_SIZE = 1 << 16
+
+# SHA1 is not used for security purposes when UUIDs are generated
+if sys.version_info >= (3, 9):
+    _SHA1_PARAMS = {'usedforsecurity': False}
+else:
+    _SHA1_PARAMS = {}
+
+# Hash algorithms available to generate UUIDs
+SHA1 = 'sha1'
+BLAKE3 = 'blake3'
+UUID_HASH_ALGORITHMS = (SHA1, BLAKE3)
+
 
 def unaccent_string(unistr):
     """Convert a Unicode string to its canonical form without accents.
@@ -36,20 +58,45 @@ def unaccent_string(unistr):
         msg = "argument must be a string; {} given".format(unistr.__class__.__name__)
         raise TypeError(msg)
 
-    cs = [c for c in unicodedata.normalize('NFD', unistr)
-          if unicodedata.category(c) != 'Mn']
-    string = ''.join(cs)
+    # ASCII strings do not have accents, so there is nothing to do
+    if unistr.isascii():
+        return unistr
+
+    # Canonical decomposition is used on purpose. A compatibility
+    # decomposition (NFKD) would also replace characters like ligatures
+    # or full-width letters, changing the UUIDs of stored identities.
+    string = unicodedata.normalize('NFD', unistr)
+    string = string.translate(_nonspacing_marks_table())
 
     return string
 
 
-def generate_uuid(source, email=None, name=None, username=None):
+@functools.lru_cache(maxsize=None)
+def _nonspacing_marks_table():
+    """Translation table to remove non-spacing marks ('Mn') from strings.
+
+    The table is built the first time it is needed and it is
+    reused in the next calls.
+    """
+    return dict.fromkeys(c for c in range(sys.maxunicode + 1)
+                         if unicodedata.category(chr(c)) == 'Mn')
+
+
+def generate_uuid(source, email=None, name=None, username=None,
+                  algorithm=SHA1):
     """Generate a UUID related to identity data.
 
     Based on the input data, the function will return the UUID
     associated to an identity. On this version, the UUID will
     be the SHA1 of `source:email:name:username` string.
 
+    BLAKE3 can be used instead of SHA1 setting `algorithm` to
+    `blake3`. It requires the `blake3` package. The UUID will be
+    the first 20 bytes of the BLAKE3 hash, so both algorithms
+    generate UUIDs of the same length. Take into account the UUIDs
+    generated by each algorithm are different, so the same
+    algorithm must be used to generate all the UUIDs of a registry.
+
     This string is case insensitive, which means same values
     for the input parameters in upper or lower case will produce
     the same UUID.
@@ -68,18 +115,81 @@ def generate_uuid(source, email=None, name=None, username=None):
     :param email: email of the identity
     :param name: full name of the identity
     :param username: user name used by the identity
+    :param algorithm: hash algorithm used to generate the UUID;
+        `sha1` or `blake3`
 
     :returns: a universal unique identifier for Sorting Hat
 
     :raises ValueError: when source is `None` or empty; each one
-        of the parameters is `None`; or the parameters are empty.
+        of the parameters is `None`; the parameters are empty;
+        or the hash algorithm is not supported or not available
     """
-    def to_str(value, unaccent=False):
-        s = str(value)
-        if unaccent:
-            return unaccent_string(s)
+    validate_hash_algorithm(algorithm)
+    _validate_identity_data(source, email, name, username)
+
+    return _generate_uuid(source, email, name, username, algorithm)
+
+
+def generate_uuids_batch(identities, algorithm=SHA1):
+    """Generate the UUIDs of a batch of identities.
+
+    This function works like `generate_uuid` but it processes
+    a sequence of `(source, email, name, username)` tuples.
+    Each UUID is still generated, or taken from the cache, one
+    by one; the hash algorithm is only checked once for the
+    whole sequence.
+
+    Instead of raising a `ValueError`, tuples with invalid data
+    will have a `None` value on the returned list.
+
+    :param identities: sequence of `(source, email, name, username)`
+        tuples
+    :param algorithm: hash algorithm used to generate the UUIDs;
+        `sha1` or `blake3`
+
+    :returns: list of UUIDs in the same order as the input tuples
+
+    :raises ValueError: when the hash algorithm is not supported
+        or it is not available
+    """
+    validate_hash_algorithm(algorithm)
+
+    uuids = []
+    for source, email, name, username in identities:
+        try:
+            _validate_identity_data(source, email, name, username)
+        except ValueError:
+            uuids.append(None)
         else:
-            return s
+            uuids.append(_generate_uuid(source, email, name, username, algorithm))
+
+    return uuids
+
+
+def clear_uuids_cache():
+    """Remove the UUIDs stored in the cache of `generate_uuid`."""
+
+    _generate_uuid.cache_clear()
+
+
+def validate_hash_algorithm(algorithm):
+    """Check whether the hash algorithm can be used to generate UUIDs.
+
+    :param algorithm: hash algorithm; `sha1` or `blake3`
+
+    :raises ValueError: when the hash algorithm is not supported
+        or it is not available
+    """
+    if algorithm not in UUID_HASH_ALGORITHMS:
+        msg = "'{}' is not a valid hash algorithm; valid values are: {}".format(
+            algorithm, ', '.join(UUID_HASH_ALGORITHMS))
+        raise ValueError(msg)
+    if algorithm == BLAKE3 and not blake3:
+        raise ValueError("'blake3' package is required to use BLAKE3 algorithm")
+
+
+def _validate_identity_data(source, email, name, username):
+    """Check whether the data of an identity is valid to get its UUID."""
 
     if source is None:
         raise ValueError("'source' cannot be None")
@@ -88,13 +198,32 @@ def generate_uuid(source, email=None, name=None, username=None):
     if not (email or name or username):
         raise ValueError("identity data cannot be empty")
 
-    s = ':'.join((to_str(source),
-                  to_str(email),
-                  to_str(name, unaccent=True),
-                  to_str(username))).lower()
-    s = s.encode('UTF-8', errors="surrogateescape")
 
-    sha1 = hashlib.sha1(s)
-    uuid = sha1.hexdigest()
+@functools.lru_cache(maxsize=UUIDS_CACHE_SIZE, typed=True)
+def _generate_uuid(source, email, name, username, algorithm):
+    """Generate the UUID of a valid identity.
+
+    Identities with the same data always have the same UUID,
+    so the results are cached. This is useful when the same
+    identities are processed several times, like during the
+    import of identities.
+    """
+    # Values are converted to strings as they are, so `None` values
+    # are represented as 'None'. Values are lowercased after joining
+    # them. Lowercasing each value or using 'casefold' would generate
+    # different UUIDs for some of the identities already stored (e.g.
+    # names with 'ß' or ending in Greek capital sigma).
+    name = unaccent_string(str(name))
+    s = f"{source!s}:{email!s}:{name}:{username!s}".lower()
+    if s.isascii():
+        s = s.encode('ascii')
+    else:
+        s = s.encode('UTF-8', errors="surrogateescape")
+
+    if algorithm == BLAKE3:
+        uuid = blake3.blake3(s).hexdigest(length=20)
+    else:
+        sha1 = hashlib.sha1(s, **_SHA1_PARAMS)
+        uuid = sha1.hexdigest()
 
     return uuid
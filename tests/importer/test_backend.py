@@ -20,14 +20,28 @@
 #     Jose Javier Merchante <jjmerchante@bitergia.com>
 #
 
+import datetime
+
+from dateutil.tz import UTC
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
+from sortinghat.core import api
 from sortinghat.core.context import SortingHatContext
 from sortinghat.core.importer.backend import IdentitiesImporter
-from sortinghat.core.models import Individual, Identity
+from sortinghat.core.models import (Individual,
+                                    Identity,
+                                    Organization,
+                                    Enrollment,
+                                    MIN_PERIOD_DATE,
+                                    MAX_PERIOD_DATE)
 from sortinghat.core.importer.models import (Individual as ImpIndividual,
-                                             Identity as ImpIdentity)
+                                             Identity as ImpIdentity,
+                                             Enrollment as ImpEnrollment,
+                                             Organization as ImpOrganization,
+                                             Profile as ImpProfile)
+from sortinghat.utils import _generate_uuid
 
 
 class MockedIdentitiesImporter(IdentitiesImporter):
@@ -43,6 +57,131 @@ class MockedIdentitiesImporter(IdentitiesImporter):
         return [indiv]
 
 
+class MockedMergeIdentitiesImporter(IdentitiesImporter):
+    NAME = 'test_merge_backend'
+
+    def get_individuals(self):
+        indiv_a = ImpIndividual()
+        indiv_a.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        indiv_a.identities.append(ImpIdentity(source='test_backend', email='jsmith@example.com'))
+
+        indiv_b = ImpIndividual()
+        indiv_b.identities.append(ImpIdentity(source='test_backend', name='John Smith'))
+        indiv_b.identities.append(ImpIdentity(source='test_backend', email='jsmith@example.com'))
+
+        indiv_c = ImpIndividual()
+        indiv_c.identities.append(ImpIdentity(source='test_backend', username='jdoe'))
+        indiv_c.identities.append(ImpIdentity(source='test_backend'))
+
+        return [indiv_a, indiv_b, indiv_c]
+
+
+class MockedProfileIdentitiesImporter(IdentitiesImporter):
+    NAME = 'test_profile_backend'
+
+    def get_individuals(self):
+        indiv_a = ImpIndividual(profile=ImpProfile(name='John Smith'))
+        indiv_a.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+
+        # This individual is merged with a stored one
+        indiv_b = ImpIndividual()
+        indiv_b.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        indiv_b.identities.append(ImpIdentity(source='test_backend', email='jsmith@example.com'))
+
+        return [indiv_a, indiv_b]
+
+
+class MockedMergeEnrollmentsImporter(IdentitiesImporter):
+    NAME = 'test_merge_enrollments_backend'
+
+    def get_individuals(self):
+        indiv_a = ImpIndividual()
+        indiv_a.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        indiv_a.enrollments.append(ImpEnrollment(ImpOrganization(name='Example')))
+
+        # This individual is merged with a stored one
+        indiv_b = ImpIndividual()
+        indiv_b.identities.append(ImpIdentity(source='test_backend', email='jsmith@example.com'))
+        indiv_b.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+
+        return [indiv_a, indiv_b]
+
+
+class MockedBatchIdentitiesImporter(IdentitiesImporter):
+    NAME = 'test_batch_backend'
+    BATCH_SIZE = 2
+
+    def get_individuals(self):
+        for username in ['jsmith', 'jdoe', 'jrae', 'jroe']:
+            indiv = ImpIndividual()
+            indiv.identities.append(ImpIdentity(source='test_backend', username=username))
+            yield indiv
+
+        # This individual is merged with the ones of the first batch
+        indiv = ImpIndividual()
+        indiv.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        indiv.identities.append(ImpIdentity(source='test_backend', username='jdoe'))
+        yield indiv
+
+
+class MockedFailingIdentitiesImporter(IdentitiesImporter):
+    NAME = 'test_failing_backend'
+    BATCH_SIZE = 1
+
+    def get_individuals(self):
+        indiv = ImpIndividual()
+        indiv.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        yield indiv
+
+        raise RuntimeError("error reading individuals")
+
+
+class MockedSharedIdentitiesImporter(IdentitiesImporter):
+    NAME = 'test_shared_backend'
+
+    def get_individuals(self):
+        example = ImpOrganization(name='Example')
+        bitergia = ImpOrganization(name='Bitergia')
+
+        # Individuals 'a' and 'b' share the 'jsmith' identity
+        indiv_a = ImpIndividual()
+        indiv_a.identities.append(ImpIdentity(source='test_backend', email='jsmith@example.com'))
+        indiv_a.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        indiv_a.enrollments.append(ImpEnrollment(example))
+
+        indiv_b = ImpIndividual()
+        indiv_b.identities.append(ImpIdentity(source='test_backend', email='jsmith@bitergia.com'))
+        indiv_b.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        indiv_b.enrollments.append(ImpEnrollment(bitergia))
+
+        indiv_c = ImpIndividual()
+        indiv_c.identities.append(ImpIdentity(source='test_backend', email='jdoe@example.com'))
+        indiv_c.identities.append(ImpIdentity(source='test_backend', username='jdoe'))
+        indiv_c.enrollments.append(ImpEnrollment(example))
+
+        return [indiv_a, indiv_b, indiv_c]
+
+
+class MockedEnrollmentsImporter(IdentitiesImporter):
+    NAME = 'test_enrollments_backend'
+
+    def get_individuals(self):
+        example = ImpOrganization(name='Example')
+        bitergia = ImpOrganization(name='Bitergia')
+
+        indiv_a = ImpIndividual()
+        indiv_a.identities.append(ImpIdentity(source='test_backend', username='jsmith'))
+        indiv_a.enrollments.append(ImpEnrollment(example))
+        indiv_a.enrollments.append(ImpEnrollment(bitergia))
+
+        indiv_b = ImpIndividual()
+        indiv_b.identities.append(ImpIdentity(source='test_backend', username='jdoe'))
+        indiv_b.enrollments.append(ImpEnrollment(example))
+        indiv_b.enrollments.append(ImpEnrollment(ImpOrganization(name=None)))
+
+        return [indiv_a, indiv_b]
+
+
 class TestBackend(TestCase):
 
     def setUp(self):
@@ -128,3 +267,206 @@ class TestBackend(TestCase):
         self.assertEqual(indiv.identities.first(), identity)
         self.assertEqual(identity.source, 'test_backend')
         self.assertEqual(identity.username, 'test_user')
+
+    def test_load_merge_individuals(self):
+        """Test if individuals sharing identities are merged"""
+
+        importer = MockedMergeIdentitiesImporter(self.ctx, 'foo.url')
+        nidentities = importer.import_identities()
+
+        # The identity without data is not imported
+        self.assertEqual(nidentities, 4)
+
+        individuals = Individual.objects.order_by('profile__name')
+        self.assertEqual(len(individuals), 2)
+
+        indiv = individuals[0]
+        identities = sorted([identity.username for identity in indiv.identities.all()])
+        self.assertListEqual(identities, ['jdoe'])
+
+        indiv = individuals[1]
+        identities = indiv.identities.order_by('name', 'email', 'username')
+        self.assertEqual(len(identities), 3)
+        self.assertEqual(identities[0].username, 'jsmith')
+        self.assertEqual(identities[1].email, 'jsmith@example.com')
+        self.assertEqual(identities[2].name, 'John Smith')
+
+    def test_load_merge_stored_individuals(self):
+        """Test if imported identities are merged with the stored ones"""
+
+        api.add_identity(self.ctx, source='test_backend', email='jsmith@example.com')
+        api.add_identity(self.ctx, source='test_backend', username='jdoe')
+
+        importer = MockedMergeIdentitiesImporter(self.ctx, 'foo.url')
+        nidentities = importer.import_identities()
+
+        # Stored identities are not counted
+        self.assertEqual(nidentities, 2)
+
+        individuals = Individual.objects.all()
+        self.assertEqual(len(individuals), 2)
+
+        identities = Identity.objects.all()
+        self.assertEqual(len(identities), 4)
+
+        identity = Identity.objects.get(username='jsmith')
+        self.assertEqual(identity.individual.identities.count(), 3)
+
+        identity = Identity.objects.get(username='jdoe')
+        self.assertEqual(identity.individual.identities.count(), 1)
+
+    def test_load_merge_stored_profile(self):
+        """Test if the profile of a stored individual is kept after merging it"""
+
+        identity = api.add_identity(self.ctx, source='test_backend', email='jsmith@example.com')
+        api.update_profile(self.ctx, identity.uuid, name='J. Smith')
+
+        importer = MockedProfileIdentitiesImporter(self.ctx, 'foo.url')
+        nidentities = importer.import_identities()
+
+        self.assertEqual(nidentities, 1)
+
+        individuals = Individual.objects.all()
+        self.assertEqual(len(individuals), 1)
+
+        individual = individuals[0]
+        self.assertEqual(individual.mk, identity.uuid)
+        self.assertEqual(individual.identities.count(), 2)
+        self.assertEqual(individual.profile.name, 'J. Smith')
+
+    def test_load_locked_individuals(self):
+        """Test if imported identities are not merged with locked individuals"""
+
+        identity = api.add_identity(self.ctx, source='test_backend', email='jsmith@example.com')
+        api.lock(self.ctx, identity.uuid)
+
+        importer = MockedMergeIdentitiesImporter(self.ctx, 'foo.url')
+        nidentities = importer.import_identities()
+
+        self.assertEqual(nidentities, 3)
+
+        individuals = Individual.objects.all()
+        self.assertEqual(len(individuals), 4)
+
+        identity = Identity.objects.get(email='jsmith@example.com')
+        self.assertEqual(identity.individual.identities.count(), 1)
+        self.assertEqual(identity.individual.is_locked, True)
+
+    def test_load_enrollments(self):
+        """Test if organizations and enrollments are imported"""
+
+        api.add_organization(self.ctx, name='Bitergia')
+
+        importer = MockedEnrollmentsImporter(self.ctx, 'foo.url')
+        importer.import_identities()
+
+        organizations = Organization.objects.order_by('name')
+        self.assertEqual(len(organizations), 2)
+        self.assertEqual(organizations[0].name, 'Bitergia')
+        self.assertEqual(organizations[1].name, 'Example')
+
+        enrollments = Enrollment.objects.filter(individual__identities__username='jsmith')
+        enrollments = enrollments.order_by('group__name')
+        self.assertEqual(len(enrollments), 2)
+        self.assertEqual(enrollments[0].group.name, 'Bitergia')
+        self.assertEqual(enrollments[0].start, MIN_PERIOD_DATE)
+        self.assertEqual(enrollments[0].end, MAX_PERIOD_DATE)
+        self.assertEqual(enrollments[1].group.name, 'Example')
+
+        enrollments = Enrollment.objects.filter(individual__identities__username='jdoe')
+        self.assertEqual(len(enrollments), 1)
+        self.assertEqual(enrollments[0].group.name, 'Example')
+
+        # Running it again does not duplicate data
+        importer.import_identities()
+
+        self.assertEqual(Organization.objects.count(), 2)
+        self.assertEqual(Enrollment.objects.count(), 3)
+
+    def test_load_merge_stored_enrollments(self):
+        """Test if enrollments are merged with the ones of a stored individual"""
+
+        identity = api.add_identity(self.ctx, source='test_backend', email='jsmith@example.com')
+        api.add_organization(self.ctx, 'Example')
+        api.enroll(self.ctx, identity.uuid, 'Example',
+                   from_date=datetime.datetime(2010, 1, 1),
+                   to_date=datetime.datetime(2015, 1, 1))
+
+        importer = MockedMergeEnrollmentsImporter(self.ctx, 'foo.url')
+        importer.import_identities()
+
+        individuals = Individual.objects.all()
+        self.assertEqual(len(individuals), 1)
+
+        enrollments = individuals[0].enrollments.all()
+        self.assertEqual(len(enrollments), 1)
+
+        enrollment = enrollments[0]
+        self.assertEqual(enrollment.group.name, 'Example')
+        self.assertEqual(enrollment.start, datetime.datetime(2010, 1, 1, tzinfo=UTC))
+        self.assertEqual(enrollment.end, datetime.datetime(2015, 1, 1, tzinfo=UTC))
+
+    def test_load_batches(self):
+        """Test if individuals are loaded in batches from a generator"""
+
+        importer = MockedBatchIdentitiesImporter(self.ctx, 'foo.url')
+        nidentities = importer.import_identities()
+
+        self.assertEqual(nidentities, 4)
+
+        individuals = Individual.objects.all()
+        self.assertEqual(len(individuals), 3)
+
+        identities = Identity.objects.all()
+        self.assertEqual(len(identities), 4)
+
+        identity = Identity.objects.get(username='jsmith')
+        usernames = sorted([identity.username for identity in identity.individual.identities.all()])
+        self.assertListEqual(usernames, ['jdoe', 'jsmith'])
+
+    def test_load_shared_identities(self):
+        """Test if individuals sharing identities are merged with their enrollments"""
+
+        importer = MockedSharedIdentitiesImporter(self.ctx, 'foo.url')
+        nidentities = importer.import_identities()
+
+        self.assertEqual(nidentities, 5)
+
+        individuals = Individual.objects.all()
+        self.assertEqual(len(individuals), 2)
+
+        identities = Identity.objects.all()
+        self.assertEqual(len(identities), 5)
+
+        identity = Identity.objects.get(username='jsmith')
+        individual = identity.individual
+
+        emails = sorted([identity.email for identity in individual.identities.all()
+                         if identity.email])
+        self.assertListEqual(emails, ['jsmith@bitergia.com', 'jsmith@example.com'])
+
+        orgs = sorted([enrollment.group.name for enrollment in individual.enrollments.all()])
+        self.assertListEqual(orgs, ['Bitergia', 'Example'])
+
+        identity = Identity.objects.get(username='jdoe')
+        individual = identity.individual
+        self.assertEqual(individual.identities.count(), 2)
+
+        orgs = [enrollment.group.name for enrollment in individual.enrollments.all()]
+        self.assertListEqual(orgs, ['Example'])
+
+        self.assertEqual(Organization.objects.count(), 2)
+        self.assertEqual(Enrollment.objects.count(), 3)
+
+    def test_clear_uuids_cache_on_error(self):
+        """Test if the cache of UUIDs is cleared when the import fails"""
+
+        importer = MockedFailingIdentitiesImporter(self.ctx, 'foo.url')
+
+        with self.assertRaises(RuntimeError):
+            importer.import_identities()
+
+        self.assertEqual(_generate_uuid.cache_info().currsize, 0)
+
+        identities = Identity.objects.all()
+        self.assertEqual(len(identities), 1)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2014-2024 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import unittest
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+INVALID_HASH_ALGORITHM_ERROR = "invalid 'SORTINGHAT_UUID_HASH' setting; 'md5' is not a valid hash algorithm"
+BLAKE3_NOT_AVAILABLE_ERROR = "'blake3' package is required"
+
+
+class TestSortingHatCoreConfig(TestCase):
+    """Unit tests for the configuration of the core app"""
+
+    @override_settings(SORTINGHAT_UUID_HASH='sha1')
+    def test_ready(self):
+        """Check if the app is ready when the settings are valid"""
+
+        app_config = apps.get_app_config('core')
+        app_config.ready()
+
+    @override_settings()
+    def test_default_uuid_hash(self):
+        """Check if the app is ready when the UUID hash algorithm is not set"""
+
+        del settings.SORTINGHAT_UUID_HASH
+
+        app_config = apps.get_app_config('core')
+        app_config.ready()
+
+    @override_settings(SORTINGHAT_UUID_HASH='md5')
+    def test_invalid_uuid_hash(self):
+        """Check if it fails when the UUID hash algorithm is not valid"""
+
+        app_config = apps.get_app_config('core')
+
+        with self.assertRaisesRegex(ImproperlyConfigured, INVALID_HASH_ALGORITHM_ERROR):
+            app_config.ready()
+
+    @unittest.skipIf(blake3, "'blake3' package is installed")
+    @override_settings(SORTINGHAT_UUID_HASH='blake3')
+    def test_blake3_not_available(self):
+        """Check if it fails when BLAKE3 is set but it is not installed"""
+
+        app_config = apps.get_app_config('core')
+
+        with self.assertRaisesRegex(ImproperlyConfigured, BLAKE3_NOT_AVAILABLE_ERROR):
+            app_config.ready()
@@ -200,6 +200,55 @@ class TestFindIdentity(TestCase):
             db.find_identity('zyxwuv')
 
 
+class TestSearchIdentities(TestCase):
+    """Unit tests for search_identities"""
+
+    def setUp(self):
+        """Load initial dataset"""
+
+        jsmith = Individual.objects.create(mk='1234567890ABCDFE')
+        Identity.objects.create(uuid='0001', source='scm', individual=jsmith)
+        Identity.objects.create(uuid='0002', source='mls', individual=jsmith)
+
+        jdoe = Individual.objects.create(mk='ABCDEFGHIJKLMN')
+        Identity.objects.create(uuid='0003', source='scm', individual=jdoe)
+
+    def test_search_identities(self):
+        """Test if a set of identities is found by their UUIDs"""
+
+        identities = db.search_identities(['0001', '0003'])
+        identities = sorted(identities, key=lambda x: x.uuid)
+
+        self.assertEqual(len(identities), 2)
+
+        identity = identities[0]
+        self.assertIsInstance(identity, Identity)
+        self.assertEqual(identity.uuid, '0001')
+        self.assertEqual(identity.individual.mk, '1234567890ABCDFE')
+
+        identity = identities[1]
+        self.assertIsInstance(identity, Identity)
+        self.assertEqual(identity.uuid, '0003')
+        self.assertEqual(identity.individual.mk, 'ABCDEFGHIJKLMN')
+
+    def test_search_not_found(self):
+        """Test if identities not found are ignored"""
+
+        identities = db.search_identities(['0002', 'zyxwuv'])
+
+        self.assertEqual(len(identities), 1)
+        self.assertEqual(identities[0].uuid, '0002')
+
+        identities = db.search_identities(['zyxwuv'])
+        self.assertEqual(len(identities), 0)
+
+    def test_search_empty(self):
+        """Test if no identities are returned when the list is empty"""
+
+        identities = db.search_identities([])
+        self.assertEqual(len(identities), 0)
+
+
 class TestFindOrganization(TestCase):
     """Unit tests for find_organization"""
 
@@ -243,6 +292,65 @@ class TestFindOrganization(TestCase):
         self.assertIsInstance(organization, Organization)
 
 
+class TestSearchOrganizations(TestCase):
+    """Unit tests for search_organizations"""
+
+    def setUp(self):
+        """Load initial dataset"""
+
+        org = Organization.add_root(name='Example')
+        Alias.objects.create(alias='Example Inc.', organization=org)
+
+        Organization.add_root(name='Bitergia')
+        Organization.add_root(name='LibreSoft')
+
+    def test_search_organizations(self):
+        """Test if a set of organizations is found by their names"""
+
+        organizations = db.search_organizations(['Example', 'Bitergia'])
+        organizations = sorted(organizations, key=lambda x: x.name)
+
+        self.assertEqual(len(organizations), 2)
+
+        org = organizations[0]
+        self.assertIsInstance(org, Organization)
+        self.assertEqual(org.name, 'Bitergia')
+
+        org = organizations[1]
+        self.assertIsInstance(org, Organization)
+        self.assertEqual(org.name, 'Example')
+
+    def test_search_aliases(self):
+        """Test if organizations are found by their aliases"""
+
+        organizations = db.search_organizations(['Example Inc.', 'Example'])
+
+        self.assertEqual(len(organizations), 1)
+
+        org = organizations[0]
+        self.assertEqual(org.name, 'Example')
+
+        aliases = [alias.alias for alias in org.aliases.all()]
+        self.assertListEqual(aliases, ['Example Inc.'])
+
+    def test_search_not_found(self):
+        """Test if organizations not found are ignored"""
+
+        organizations = db.search_organizations(['LibreSoft', 'Unknown'])
+
+        self.assertEqual(len(organizations), 1)
+        self.assertEqual(organizations[0].name, 'LibreSoft')
+
+        organizations = db.search_organizations(['Unknown'])
+        self.assertEqual(len(organizations), 0)
+
+    def test_search_empty(self):
+        """Test if no organizations are returned when the list is empty"""
+
+        organizations = db.search_organizations([])
+        self.assertEqual(len(organizations), 0)
+
+
 class TestFindTeam(TestCase):
     """Unit tests for find_team"""
 
@@ -19,14 +19,25 @@
 #     Santiago Dueñas <sduenas@bitergia.com>
 #
 
+import unittest
 
 from django.test import TestCase
 
-from sortinghat.utils import unaccent_string, generate_uuid
+from sortinghat.utils import (unaccent_string,
+                              generate_uuid,
+                              generate_uuids_batch,
+                              clear_uuids_cache,
+                              validate_hash_algorithm)
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
 UNACCENT_TYPE_ERROR = "argument must be a string; int given"
 IDENTITY_NONE_OR_EMPTY_ERROR = "identity data cannot be empty"
 SOURCE_NONE_OR_EMPTY_ERROR = "'source' cannot be"
+INVALID_HASH_ALGORITHM_ERROR = "'md5' is not a valid hash algorithm"
 
 
 class TestUnnacentString(TestCase):
@@ -44,6 +55,27 @@ class TestUnnacentString(TestCase):
         result = unaccent_string('Santiago Dueñas')
         self.assertEqual(result, 'Santiago Duenas')
 
+    def test_ascii(self):
+        """Check if ASCII strings are not modified"""
+
+        result = unaccent_string('John Smith')
+        self.assertEqual(result, 'John Smith')
+
+        result = unaccent_string('')
+        self.assertEqual(result, '')
+
+    def test_compatibility_chars(self):
+        """Check if compatibility characters are not decomposed"""
+
+        result = unaccent_string('\ufb01lipe \uff2aos\u00e9')
+        self.assertEqual(result, '\ufb01lipe \uff2aose')
+
+    def test_only_nonspacing_marks(self):
+        """Check if non-spacing marks are removed but other chars are kept"""
+
+        result = unaccent_string('Ma\u0301ximo \u00f8 \u0141ukasz \u4e2d\u6587')
+        self.assertEqual(result, 'Maximo \u00f8 \u0141ukasz \u4e2d\u6587')
+
     def test_no_string(self):
         """Check if an exception is raised when the type is not a string"""
 
@@ -100,6 +132,24 @@ class TestUUID(TestCase):
                                name='John Smith', username='jsmith')
         self.assertEqual(uuid_e, uuid_a)
 
+    def test_case_insensitive_stable(self):
+        """Check if UUIDs do not change for special lowercase rules"""
+
+        # Capital sigma is not converted to final sigma
+        # because the string is lowercased once is joined
+        result = generate_uuid('scm', email='', name='ΟΔΥΣΣΕΑΣ', username='odysseas')
+        self.assertEqual(result, '71e8af44ee95a8fd0e29839a8e80f12fc9c99c05')
+
+        result = generate_uuid('scm', email='', name='οδυσσεας', username='odysseas')
+        self.assertEqual(result, '44db3a523763b4a82422d9a1c8d5b649f1b8329a')
+
+        # Strings are not casefolded
+        result = generate_uuid('scm', email='', name='Straße', username='')
+        self.assertEqual(result, 'cfdc4c79b4d01c1e32e77b0dd6f5cd5561863223')
+
+        result = generate_uuid('scm', email='', name='Strasse', username='')
+        self.assertEqual(result, '7b473aa8fc76cde6774fd1d200d23a93c0572f20')
+
     def test_case_unaccent_name(self):
         """Check if same values accent or unaccent produce the same UUID"""
 
@@ -125,6 +175,42 @@ class TestUUID(TestCase):
         result = generate_uuid('scm', name="Mishal\udcc5 Pytasz")
         self.assertEqual(result, '625166bdc2c4f1a207d39eb8d25315010babd73b')
 
+    @unittest.skipIf(not blake3, "'blake3' package is not installed")
+    def test_uuid_blake3(self):
+        """Check whether the function returns the expected BLAKE3 UUID"""
+
+        result = generate_uuid('scm', email='jsmith@example.com',
+                               name='John Smith', username='jsmith',
+                               algorithm='blake3')
+        self.assertEqual(result, 'f3dace6f7f8ab51f52d6e3bbd1fd403579dddb6e')
+
+        accent_result = generate_uuid('scm', email='', name="Max Müster", username='mmuester',
+                                      algorithm='blake3')
+        unaccent_result = generate_uuid('scm', email='', name="Max Muster", username='mmuester',
+                                        algorithm='blake3')
+        self.assertEqual(accent_result, unaccent_result)
+        self.assertEqual(accent_result, '9f31a9d250fea2a59de755b324ae891e06c4b07e')
+
+        result = generate_uuid('scm', email='jsmith@example.com',
+                               name='John Smith', username='jsmith',
+                               algorithm='sha1')
+        self.assertEqual(result, 'a9b403e150dd4af8953a52a4bb841051e4b705d9')
+
+    def test_invalid_algorithm(self):
+        """Check whether UUID cannot be obtained with an invalid hash algorithm"""
+
+        with self.assertRaisesRegex(ValueError, INVALID_HASH_ALGORITHM_ERROR):
+            generate_uuid('scm', email='jsmith@example.com', algorithm='md5')
+
+    def test_compatibility_chars_name(self):
+        """Check if compatibility characters generate different UUIDs"""
+
+        result = generate_uuid('scm', email='', name='\ufb01lipe', username='')
+        self.assertEqual(result, 'fe96e572e8edd0808888ce4e830eda7645da8f9b')
+
+        result = generate_uuid('scm', email='', name='filipe', username='')
+        self.assertEqual(result, '48779a1069120ce971c60beea329728192787a43')
+
     def test_none_source(self):
         """Check whether UUID cannot be obtained giving a None source"""
 
@@ -145,3 +231,143 @@ class TestUUID(TestCase):
 
         with self.assertRaisesRegex(ValueError, IDENTITY_NONE_OR_EMPTY_ERROR):
             generate_uuid('scm', email='', name='', username='')
+
+    def test_cached_uuid(self):
+        """Check if the same UUID is returned after cleaning the cache"""
+
+        clear_uuids_cache()
+
+        uuid_a = generate_uuid('scm', email='jsmith@example.com',
+                               name='John Smith', username='jsmith')
+        uuid_b = generate_uuid('scm', email='jsmith@example.com',
+                               name='John Smith', username='jsmith')
+        self.assertEqual(uuid_a, 'a9b403e150dd4af8953a52a4bb841051e4b705d9')
+        self.assertEqual(uuid_b, uuid_a)
+
+        clear_uuids_cache()
+
+        uuid_c = generate_uuid('scm', email='jsmith@example.com',
+                               name='John Smith', username='jsmith')
+        self.assertEqual(uuid_c, uuid_a)
+
+    def test_cached_uuid_typed(self):
+        """Check if equal values of different types are not mixed in the cache"""
+
+        clear_uuids_cache()
+
+        uuid_a = generate_uuid('scm', email=1)
+        uuid_b = generate_uuid('scm', email=True)
+        self.assertEqual(uuid_a, '77de4a1b0da798350b4714e1e4f750cc5474f740')
+        self.assertEqual(uuid_b, 'ee05474b58ba6633c5f1431e87e4e5669ce4b4fe')
+
+
+class TestValidateHashAlgorithm(TestCase):
+    """Unit tests for validate_hash_algorithm function"""
+
+    def test_valid_algorithm(self):
+        """Check if SHA1 is a valid algorithm"""
+
+        validate_hash_algorithm('sha1')
+
+    def test_invalid_algorithm(self):
+        """Check if it fails when the algorithm is not supported"""
+
+        with self.assertRaisesRegex(ValueError, INVALID_HASH_ALGORITHM_ERROR):
+            validate_hash_algorithm('md5')
+
+
+class TestUUIDsBatch(TestCase):
+    """Unit tests for generate_uuids_batch function"""
+
+    def test_uuids_batch(self):
+        """Check whether the function returns the expected UUIDs"""
+
+        identities = [
+            ('scm', 'jsmith@example.com', 'John Smith', 'jsmith'),
+            ('scm', 'jsmith@example.com', None, None),
+            ('scm', '', 'John Ca\xf1as', 'jcanas'),
+            ('scm', '', "Max Müster", 'mmuester'),
+            ('scm', None, "Mishal\udcc5 Pytasz", None)
+        ]
+
+        result = generate_uuids_batch(identities)
+
+        expected = [
+            'a9b403e150dd4af8953a52a4bb841051e4b705d9',
+            '334da68fcd3da4e799791f73dfada2afb22648c6',
+            'c88e126749ff006eb1eea25e4bb4c1c125185ed2',
+            '9a0498297d9f0b7e4baf3e6b3740d22d2257367c',
+            '625166bdc2c4f1a207d39eb8d25315010babd73b'
+        ]
+        self.assertListEqual(result, expected)
+
+    def test_same_as_generate_uuid(self):
+        """Check if the UUIDs are the same that generate_uuid returns"""
+
+        identities = [
+            ('scm', 'jsmith@example.com', 'John Smith', 'jsmith'),
+            ('SCM', 'JSMITH@example.com', 'Jöhn Smith', 'JSmith'),
+            ('mls', None, 'Santiago Dueñas', None),
+            ('mls', None, None, 'sduenas')
+        ]
+
+        result = generate_uuids_batch(identities)
+
+        expected = [generate_uuid(source, email=email, name=name, username=username)
+                    for source, email, name, username in identities]
+        self.assertListEqual(result, expected)
+
+    def test_invalid_data(self):
+        """Check if invalid tuples return None instead of raising an error"""
+
+        identities = [
+            (None, 'jsmith@example.com', 'John Smith', 'jsmith'),
+            ('', 'jsmith@example.com', 'John Smith', 'jsmith'),
+            ('scm', 'jsmith@example.com', 'John Smith', 'jsmith'),
+            ('scm', None, '', None),
+            ('scm', '', '', '')
+        ]
+
+        result = generate_uuids_batch(identities)
+
+        expected = [
+            None,
+            None,
+            'a9b403e150dd4af8953a52a4bb841051e4b705d9',
+            None,
+            None
+        ]
+        self.assertListEqual(result, expected)
+
+    @unittest.skipIf(not blake3, "'blake3' package is not installed")
+    def test_uuids_batch_blake3(self):
+        """Check whether the function returns the expected BLAKE3 UUIDs"""
+
+        identities = [
+            ('scm', 'jsmith@example.com', 'John Smith', 'jsmith'),
+            ('scm', '', '', '')
+        ]
+
+        result = generate_uuids_batch(identities, algorithm='blake3')
+
+        expected = [
+            'f3dace6f7f8ab51f52d6e3bbd1fd403579dddb6e',
+            None
+        ]
+        self.assertListEqual(result, expected)
+
+    def test_batch_invalid_algorithm(self):
+        """Check whether UUIDs cannot be obtained with an invalid hash algorithm"""
+
+        identities = [
+            ('scm', 'jsmith@example.com', 'John Smith', 'jsmith')
+        ]
+
+        with self.assertRaisesRegex(ValueError, INVALID_HASH_ALGORITHM_ERROR):
+            generate_uuids_batch(identities, algorithm='md5')
+
+    def test_empty_batch(self):
+        """Check if an empty list is returned when there are no identities"""
+
+        result = generate_uuids_batch([])
+        self.assertListEqual(result, [])